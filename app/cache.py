@@ -0,0 +1,55 @@
+"""In-process response caches for the read-heavy endpoints."""
+from __future__ import annotations
+
+from typing import Any
+
+from cachetools import TTLCache
+
+from app.config import settings
+
+# Keyed on (user_id, cursor, limit) so each page of /users/{user_id}/jobs is cached separately.
+job_list_cache: TTLCache[tuple[str, str | None, int], Any] = TTLCache(
+    maxsize=settings.response_cache_max_entries, ttl=settings.job_list_cache_ttl_seconds
+)
+captcha_cache: TTLCache[str, Any] = TTLCache(maxsize=1, ttl=settings.captcha_cache_ttl_seconds)
+
+# Bumped by every invalidation. A reader records the generation before querying and only stores its result if
+# it is unchanged, so a page computed before a concurrent write can never be cached after that write's invalidation.
+_job_list_generations: dict[str, int] = {}
+_captcha_generation = 0
+
+
+def job_list_generation(user_id: str) -> int:
+    return _job_list_generations.get(user_id, 0)
+
+
+def store_job_list(key: tuple[str, str | None, int], generation: int, matches: Any) -> None:
+    """Cache a page of job listings unless the user's listings changed since ``generation`` was read."""
+
+    if _job_list_generations.get(key[0], 0) == generation:
+        job_list_cache[key] = matches
+
+
+def invalidate_job_lists(user_id: str) -> None:
+    """Drop every cached page of a user's job listings."""
+
+    _job_list_generations[user_id] = _job_list_generations.get(user_id, 0) + 1
+    for key in [key for key in job_list_cache if key[0] == user_id]:
+        job_list_cache.pop(key, None)
+
+
+def captcha_generation() -> int:
+    return _captcha_generation
+
+
+def store_captcha_queue(generation: int, items: Any) -> None:
+    """Cache the captcha queue unless it changed since ``generation`` was read."""
+
+    if _captcha_generation == generation:
+        captcha_cache["queue"] = items
+
+
+def invalidate_captcha_queue() -> None:
+    global _captcha_generation
+    _captcha_generation += 1
+    captcha_cache.clear()
@@ -8,22 +8,37 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     """Central configuration for the prototype services."""
 
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", frozen=True)
 
     database_url: str = "sqlite+aiosqlite:///./data/app.db"
+    database_pool_size: int = 20
+    database_max_overflow: int = 40
+    database_pool_recycle_seconds: int = 3600
     data_directory: Path = Path("data")
     sample_job_file: Path = Path("data/sample_jobs.json")
+    job_sample_cache_enabled: bool = True
     resume_storage_directory: Path = Path("data/resumes")
     questionnaire_storage_directory: Path = Path("data/questionnaires")
+    resume_scan_window_chars: int = 32_768
+    known_user_cache_size: int = 10_000
+    known_user_cache_ttl_seconds: int = 300
 
     evaluation_batch_size: int = 10
     evaluation_similarity_threshold: float = 0.65
     deviation_tolerance: float = 1.0
+    evaluation_context_cache_size: int = 1024
+    evaluation_context_cache_ttl_seconds: int = 300
 
     application_retry_attempts: int = 3
     application_retry_backoff_seconds: int = 30
+    application_max_concurrency: int = 4
+    application_batch_max_size: int = 50
     playwright_headless: bool = True
 
+    response_cache_max_entries: int = 1024
+    job_list_cache_ttl_seconds: int = 30
+    captcha_cache_ttl_seconds: int = 10
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,19 +1,94 @@
 """Database utilities and declarative base."""
+import json
+import re
 from collections.abc import AsyncIterator
+from contextvars import ContextVar
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import orjson
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
-from app.config import settings
+from app.config import Settings, settings
 
 
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
 
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+def _engine_options(settings: Settings) -> dict[str, Any]:
+    """Pool configuration for the configured database driver."""
+
+    options: dict[str, Any] = {"pool_pre_ping": True}
+    if "asyncpg" in settings.database_url:
+        # asyncpg deployments are expected to sit behind an external pooler such as pgbouncer.
+        options["poolclass"] = NullPool
+    elif make_url(settings.database_url).database not in (None, "", ":memory:"):
+        # File-backed databases get a sized pool; in-memory SQLite uses StaticPool, which rejects sizing.
+        options.update(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_recycle=settings.database_pool_recycle_seconds,
+        )
+    return options
+
+
+def _json_dumps(value: Any) -> str:
+    """Serialise JSON columns with orjson; non-string keys are stringified like the stdlib encoder does."""
+
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        # orjson rejects integers wider than 64 bits, which free-form questionnaire answers may contain.
+        return json.dumps(value)
+
+
+# Integers with 19 or more digits may fall outside orjson's 64-bit range (e.g. -9223372036854775809), which it
+# would read back as a float.
+_WIDE_NUMBER_RE = re.compile(r"\d{19}")
+
+
+def _json_loads(value: str | bytes) -> Any:
+    """Parse JSON columns with orjson, keeping exact integers wider than 64 bits via the stdlib parser."""
+
+    if isinstance(value, str) and _WIDE_NUMBER_RE.search(value):
+        return json.loads(value)
+    return orjson.loads(value)
+
+
+engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    future=True,
+    json_serializer=_json_dumps,
+    json_deserializer=_json_loads,
+    **_engine_options(settings),
+)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+# Set per HTTP request by app.middleware.ScopedSessionMiddleware, which also removes the session.
+session_scope: ContextVar[object | None] = ContextVar("session_scope", default=None)
+AsyncScopedSession = async_scoped_session(AsyncSessionLocal, scopefunc=session_scope.get)
+
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING.
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def upsert_insert(session: AsyncSession) -> Any:
+    """Return the dialect ``insert`` construct with ``on_conflict_do_nothing``, or None if the dialect lacks it."""
+
+    return _UPSERT_INSERTS.get(session.bind.dialect.name)
+
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     """Provide a database session for dependency injection."""
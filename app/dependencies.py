@@ -1,10 +1,17 @@
 """FastAPI dependency helpers."""
 from collections.abc import AsyncIterator
+from functools import lru_cache
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings, get_settings
 from app.database import get_session
+from services import (
+    ApplicationSubmitter,
+    JobEvaluator,
+    QuestionnaireProcessor,
+    ResumeProcessor,
+)
 
 
 async def db_session() -> AsyncIterator[AsyncSession]:
@@ -14,3 +21,26 @@ async def db_session() -> AsyncIterator[AsyncSession]:
 
 def settings_provider() -> Settings:
     return get_settings()
+
+
+# Services only wrap the cached settings, so a single instance serves every request.
+
+
+@lru_cache(maxsize=1)
+def get_resume_processor() -> ResumeProcessor:
+    return ResumeProcessor(get_settings())
+
+
+@lru_cache(maxsize=1)
+def get_questionnaire_processor() -> QuestionnaireProcessor:
+    return QuestionnaireProcessor(get_settings())
+
+
+@lru_cache(maxsize=1)
+def get_job_evaluator() -> JobEvaluator:
+    return JobEvaluator(get_settings())
+
+
+@lru_cache(maxsize=1)
+def get_application_submitter() -> ApplicationSubmitter:
+    return ApplicationSubmitter(get_settings())
@@ -3,15 +3,36 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi import Depends, FastAPI, HTTPException
-from sqlalchemy import select
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.config import Settings, get_settings
-from app.database import AsyncSessionLocal, Base, engine
+from app.cache import (
+    captcha_cache,
+    captcha_generation,
+    invalidate_captcha_queue,
+    invalidate_job_lists,
+    job_list_cache,
+    job_list_generation,
+    store_captcha_queue,
+    store_job_list,
+)
+from app.config import settings
+from app.database import AsyncScopedSession, AsyncSessionLocal, Base, engine
+from app.dependencies import (
+    db_session,
+    get_application_submitter,
+    get_job_evaluator,
+    get_questionnaire_processor,
+    get_resume_processor,
+)
+from app.middleware import ScopedSessionMiddleware
 from app.models import CaptchaQueueItem, JobListing, QuestionnaireResponse
 from app.schemas import (
     ApplicationStatus,
+    BatchSubmissionRequest,
     CaptchaItem,
     EvaluationRequest,
     JobMatch,
@@ -21,48 +42,60 @@ from app.schemas import (
 from services import ApplicationSubmitter, JobEvaluator, QuestionnaireProcessor, ResumeProcessor
 
 
+# Rows fetched per round-trip by the read routes; only one partition of ORM objects is alive at a time.
+_YIELD_PER = 200
+
+
+def _latest_answers_subquery():
+    """Correlated subquery yielding the listing owner's most recent questionnaire answers."""
+
+    return (
+        select(QuestionnaireResponse.raw_answers)
+        .where(QuestionnaireResponse.user_id == JobListing.user_id)
+        .order_by(QuestionnaireResponse.created_at.desc(), QuestionnaireResponse.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
 async def init_models() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Job Automation Prototype", version="0.1.0")
+    app = FastAPI(title="Job Automation Prototype", version="0.1.0", default_response_class=ORJSONResponse)
+    app.add_middleware(ScopedSessionMiddleware)
 
     @app.on_event("startup")
     async def _startup() -> None:  # pragma: no cover - framework hook
         await init_models()
 
-    async def get_session() -> AsyncSession:
-        async with AsyncSessionLocal() as session:
-            yield session
-
-    def get_settings_dep() -> Settings:
-        return get_settings()
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:  # pragma: no cover - framework hook
+        await get_application_submitter().close()
 
     @app.post("/users/{user_id}/resume", response_model=dict)
     async def upload_resume(
         user_id: str,
         payload: ResumeUpload,
-        session: AsyncSession = Depends(get_session),
-        settings: Settings = Depends(get_settings_dep),
+        session: AsyncSession = Depends(db_session),
+        processor: ResumeProcessor = Depends(get_resume_processor),
     ) -> dict[str, Any]:
-        processor = ResumeProcessor(settings)
         resume = await processor.store_resume(session, user_id=user_id, content=payload.content)
         return {
             "resume_id": resume.id,
             "derived_skills": resume.derived_skills,
-            "storage_path": resume.storage_path,
+            "storage_path": str(processor.resolve_storage_path(resume.storage_path)),
         }
 
     @app.post("/users/{user_id}/questionnaire", response_model=dict)
     async def submit_questionnaire(
         user_id: str,
         payload: QuestionnaireSubmission,
-        session: AsyncSession = Depends(get_session),
-        settings: Settings = Depends(get_settings_dep),
+        session: AsyncSession = Depends(db_session),
+        processor: QuestionnaireProcessor = Depends(get_questionnaire_processor),
     ) -> dict[str, Any]:
-        processor = QuestionnaireProcessor(settings)
         record = await processor.store_responses(session, user_id=user_id, answers=payload.model_dump())
         return {
             "questionnaire_id": record.id,
@@ -73,15 +106,15 @@ def create_app() -> FastAPI:
     async def evaluate_jobs(
         user_id: str,
         request: EvaluationRequest,
-        session: AsyncSession = Depends(get_session),
-        settings: Settings = Depends(get_settings_dep),
+        session: AsyncSession = Depends(db_session),
+        evaluator: JobEvaluator = Depends(get_job_evaluator),
     ) -> list[JobMatch]:
-        evaluator = JobEvaluator(settings)
         matches = await evaluator.evaluate_for_user(
             session,
             user_id=user_id,
             limit=request.max_results or settings.evaluation_batch_size,
         )
+        invalidate_job_lists(user_id)
         return [
             JobMatch(
                 id=match.id,
@@ -90,8 +123,8 @@ def create_app() -> FastAPI:
                 location=match.location,
                 salary_range=(match.salary_min, match.salary_max),
                 remote_type=match.remote_type,
-                overlap=match.overlap_summary.split(", ") if match.overlap_summary else [],
-                gaps=match.gap_summary.split(", ") if match.gap_summary else [],
+                overlap=match.overlap_summary or [],
+                gaps=match.gap_summary or [],
                 culture_alignment=match.culture_tags or [],
                 notes=match.notes,
                 url=match.listing_url,
@@ -105,56 +138,81 @@ def create_app() -> FastAPI:
     @app.get("/users/{user_id}/jobs", response_model=list[JobMatch])
     async def list_jobs(
         user_id: str,
-        session: AsyncSession = Depends(get_session),
+        cursor: str | None = Query(default=None, description="Id of the last listing on the previous page"),
+        limit: int = Query(default=50, ge=1, le=500),
     ) -> list[JobMatch]:
-        stmt = select(JobListing).where(JobListing.user_id == user_id).order_by(JobListing.created_at.desc())
-        result = await session.execute(stmt)
-        listings = result.scalars().all()
-        return [
-            JobMatch(
-                id=listing.id,
-                title=listing.title,
-                company=listing.company,
-                location=listing.location,
-                salary_range=(listing.salary_min, listing.salary_max),
-                remote_type=listing.remote_type,
-                overlap=listing.overlap_summary.split(", ") if listing.overlap_summary else [],
-                gaps=listing.gap_summary.split(", ") if listing.gap_summary else [],
-                culture_alignment=listing.culture_tags or [],
-                notes=listing.notes,
-                url=listing.listing_url,
-                score=listing.score,
-                deviation=listing.deviation,
-                created_at=listing.created_at,
+        cache_key = (user_id, cursor, limit)
+        cached = job_list_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = job_list_generation(user_id)
+
+        stmt = (
+            select(JobListing)
+            .where(JobListing.user_id == user_id)
+            .order_by(JobListing.created_at.desc(), JobListing.id.desc())
+            .limit(limit)
+        )
+        if cursor is not None:
+            # Keyset pagination: resume strictly after the cursor row in (created_at, id) order.
+            cursor_created_at = (
+                select(JobListing.created_at)
+                .where(JobListing.id == cursor, JobListing.user_id == user_id)
+                .scalar_subquery()
             )
-            for listing in listings
-        ]
+            stmt = stmt.where(tuple_(JobListing.created_at, JobListing.id) < tuple_(cursor_created_at, cursor))
+        result = await AsyncScopedSession.stream_scalars(stmt.execution_options(yield_per=_YIELD_PER))
+        matches: list[JobMatch] = []
+        async for partition in result.partitions():
+            matches.extend(
+                JobMatch(
+                    id=listing.id,
+                    title=listing.title,
+                    company=listing.company,
+                    location=listing.location,
+                    salary_range=(listing.salary_min, listing.salary_max),
+                    remote_type=listing.remote_type,
+                    overlap=listing.overlap_summary or [],
+                    gaps=listing.gap_summary or [],
+                    culture_alignment=listing.culture_tags or [],
+                    notes=listing.notes,
+                    url=listing.listing_url,
+                    score=listing.score,
+                    deviation=listing.deviation,
+                    created_at=listing.created_at,
+                )
+                for listing in partition
+            )
+        if not matches and cursor is not None:
+            # An unknown cursor makes the subquery NULL and the page empty; tell it apart from the real last page.
+            cursor_exists = await AsyncScopedSession.scalar(
+                select(JobListing.id).where(JobListing.id == cursor, JobListing.user_id == user_id)
+            )
+            if cursor_exists is None:
+                raise HTTPException(status_code=400, detail="Unknown cursor")
+        store_job_list(cache_key, generation, matches)
+        return matches
 
     @app.post("/users/{user_id}/jobs/{job_id}/submit", response_model=ApplicationStatus)
     async def submit_application(
         user_id: str,
         job_id: str,
-        session: AsyncSession = Depends(get_session),
-        settings: Settings = Depends(get_settings_dep),
+        session: AsyncSession = Depends(db_session),
+        submitter: ApplicationSubmitter = Depends(get_application_submitter),
     ) -> ApplicationStatus:
-        listing_stmt = select(JobListing).where(JobListing.id == job_id, JobListing.user_id == user_id)
-        listing_result = await session.execute(listing_stmt)
-        listing = listing_result.scalar_one_or_none()
-        if listing is None:
+        stmt = select(JobListing, _latest_answers_subquery()).where(
+            JobListing.id == job_id, JobListing.user_id == user_id
+        )
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
             raise HTTPException(status_code=404, detail="Job listing not found")
 
-        questionnaire_stmt = (
-            select(QuestionnaireResponse)
-            .where(QuestionnaireResponse.user_id == user_id)
-            .order_by(QuestionnaireResponse.created_at.desc())
-            .limit(1)
-        )
-        questionnaire_result = await session.execute(questionnaire_stmt)
-        questionnaire = questionnaire_result.scalar_one_or_none()
-        answers: dict[str, Any] = questionnaire.raw_answers if questionnaire else {}
+        listing, raw_answers = row
+        answers: dict[str, Any] = raw_answers or {}
 
-        submitter = ApplicationSubmitter(settings)
         log = await submitter.submit_job(session, listing, answers)
+        invalidate_captcha_queue()
 
         return ApplicationStatus(
             job_id=listing.id,
@@ -164,23 +222,67 @@ def create_app() -> FastAPI:
             notes=log.error_message,
         )
 
-    @app.get("/captcha", response_model=list[CaptchaItem])
-    async def captcha_queue(session: AsyncSession = Depends(get_session)) -> list[CaptchaItem]:
-        stmt = select(CaptchaQueueItem).order_by(CaptchaQueueItem.created_at.desc())
+    @app.post("/users/{user_id}/jobs/submit-batch", response_model=list[ApplicationStatus])
+    async def submit_applications(
+        user_id: str,
+        request: BatchSubmissionRequest,
+        session: AsyncSession = Depends(db_session),
+        submitter: ApplicationSubmitter = Depends(get_application_submitter),
+    ) -> list[ApplicationStatus]:
+        stmt = select(JobListing, _latest_answers_subquery()).where(
+            JobListing.id.in_(request.job_ids), JobListing.user_id == user_id
+        )
         result = await session.execute(stmt)
-        queue_items = result.scalars().all()
-        return [
-            CaptchaItem(
-                job_id=item.job_listing_id,
-                company=item.job_listing.company if item.job_listing else "Unknown",
-                title=item.job_listing.title if item.job_listing else "Unknown",
-                url=item.job_listing.listing_url if item.job_listing else "",
-                added_at=item.created_at,
-                notes=item.notes,
+        rows = result.all()
+        listings = {listing.id: listing for listing, _ in rows}
+        answers: dict[str, Any] = (rows[0][1] if rows else None) or {}
+
+        logs = await submitter.submit_jobs(AsyncSessionLocal, list(listings.values()), answers)
+        invalidate_captcha_queue()
+        statuses = {
+            log.job_listing_id: ApplicationStatus(
+                job_id=log.job_listing_id,
+                status=log.status,
+                submitted_at=log.submitted_at,
+                captcha_required=log.captcha_required,
+                notes=log.error_message,
             )
-            for item in queue_items
+            for log in logs
+        }
+        return [
+            statuses.get(job_id) or ApplicationStatus(job_id=job_id, status="not_found", notes="Job listing not found")
+            for job_id in request.job_ids
         ]
 
+    @app.get("/captcha", response_model=list[CaptchaItem])
+    async def captcha_queue() -> list[CaptchaItem]:
+        cached = captcha_cache.get("queue")
+        if cached is not None:
+            return cached
+        generation = captcha_generation()
+
+        stmt = (
+            select(CaptchaQueueItem)
+            .options(selectinload(CaptchaQueueItem.job_listing))
+            .order_by(CaptchaQueueItem.created_at.desc())
+        )
+        result = await AsyncScopedSession.stream_scalars(stmt.execution_options(yield_per=_YIELD_PER))
+        items: list[CaptchaItem] = []
+        async for partition in result.partitions():
+            items.extend(
+                CaptchaItem(
+                    job_id=item.job_listing_id,
+                    company=item.job_listing.company if item.job_listing else "Unknown",
+                    title=item.job_listing.title if item.job_listing else "Unknown",
+                    url=item.job_listing.listing_url if item.job_listing else "",
+                    added_at=item.created_at,
+                    notes=item.notes,
+                )
+                for item in partition
+            )
+        store_captcha_queue(generation, items)
+        return items
+
     return app
 
 
@@ -0,0 +1,27 @@
+"""ASGI middleware for the FastAPI app."""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.database import AsyncScopedSession, session_scope
+
+
+class ScopedSessionMiddleware:
+    """Give each HTTP request its own ``AsyncScopedSession`` and close it after the response.
+
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so the route runs in the same context
+    that sets the scope.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = session_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await AsyncScopedSession.remove()
+            session_scope.reset(token)
@@ -1,22 +1,64 @@
 """Database models for the prototype services."""
 from __future__ import annotations
 
+import os
+import threading
+import time
 import uuid
 from datetime import datetime
-
-from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from typing import Any, ClassVar
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
+# Per-process UUIDv7 state: the millisecond last issued and a 12-bit sequence within it (RFC 9562, method 1).
+_id_lock = threading.Lock()
+_id_last_ms = 0
+_id_sequence = 0
+
+
+def _new_id() -> str:
+    """Return a UUIDv7 string: time-ordered, so new primary keys land at the end of the index.
+
+    The rand_a field carries a sequence counter, so ids from one process are strictly increasing even when
+    several rows are created in the same millisecond (or the clock steps backwards).
+    """
+
+    global _id_last_ms, _id_sequence
+    with _id_lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _id_last_ms:
+            _id_last_ms, _id_sequence = timestamp_ms, 0
+        elif _id_sequence < 0xFFF:
+            _id_sequence += 1
+        else:  # sequence exhausted: borrow the next millisecond
+            _id_last_ms, _id_sequence = _id_last_ms + 1, 0
+        timestamp_ms, sequence = _id_last_ms, _id_sequence
+    random_bits = int.from_bytes(os.urandom(8), "big") >> 2
+    value = (timestamp_ms << 80) | (0x7 << 76) | (sequence << 64) | (0x2 << 62) | random_bits  # version 7, RFC variant
+    return str(uuid.UUID(int=value))
+
 
 class User(Base):
     __tablename__ = "users"
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
     display_name: Mapped[str | None] = mapped_column(String(120))
     email: Mapped[str | None] = mapped_column(String(320), unique=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     resumes: Mapped[list[Resume]] = relationship("Resume", back_populates="user", cascade="all, delete-orphan")
     questionnaires: Mapped[list[QuestionnaireResponse]] = relationship(
@@ -27,33 +69,47 @@ class User(Base):
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        Index("ix_resume_user_created", "user_id", "created_at"),
+        Index("ix_resume_user_sha256", "user_id", "content_sha256"),
+    )
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     storage_path: Mapped[str] = mapped_column(String(255))
+    # Added after the initial schema; create_all() will not add it to an existing database, which must be recreated.
+    content_sha256: Mapped[str | None] = mapped_column(String(64))
     extracted_text: Mapped[str | None] = mapped_column(Text)
     derived_skills: Mapped[list[str] | None] = mapped_column(JSON)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user: Mapped[User] = relationship("User", back_populates="resumes")
 
 
 class QuestionnaireResponse(Base):
     __tablename__ = "questionnaire_responses"
+    __table_args__ = (Index("ix_questionnaire_user_created", "user_id", "created_at"),)
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     raw_answers: Mapped[dict] = mapped_column(JSON, default=dict)
     preference_vector: Mapped[dict | None] = mapped_column(JSON)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user: Mapped[User] = relationship("User", back_populates="questionnaires")
 
 
 class JobListing(Base):
     __tablename__ = "job_listings"
+    __table_args__ = (
+        Index("ix_job_user_created", "user_id", "created_at"),
+        Index("ix_job_user_ext", "user_id", "external_id", unique=True),
+    )
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     source: Mapped[str] = mapped_column(String(80))
     external_id: Mapped[str | None] = mapped_column(String(120))
@@ -64,14 +120,14 @@ class JobListing(Base):
     salary_max: Mapped[float | None] = mapped_column(Float)
     remote_type: Mapped[str | None] = mapped_column(String(50))
     culture_tags: Mapped[list[str] | None] = mapped_column(JSON)
-    overlap_summary: Mapped[str | None] = mapped_column(Text)
-    gap_summary: Mapped[str | None] = mapped_column(Text)
+    overlap_summary: Mapped[list[str] | None] = mapped_column(JSON)
+    gap_summary: Mapped[list[str] | None] = mapped_column(JSON)
     notes: Mapped[str | None] = mapped_column(Text)
     listing_url: Mapped[str] = mapped_column(String(500))
     score: Mapped[float] = mapped_column(Float, default=0.0)
     deviation: Mapped[float] = mapped_column(Float, default=0.0)
     status: Mapped[str] = mapped_column(String(30), default="pending")
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user: Mapped[User] = relationship("User", back_populates="job_listings")
     application_log: Mapped[ApplicationLog | None] = relationship(
@@ -82,7 +138,7 @@ class JobListing(Base):
 class ApplicationLog(Base):
     __tablename__ = "application_logs"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
     job_listing_id: Mapped[str] = mapped_column(ForeignKey("job_listings.id", ondelete="CASCADE"), nullable=False)
     submitted_at: Mapped[datetime | None] = mapped_column(DateTime)
     status: Mapped[str] = mapped_column(String(30), default="pending")
@@ -95,10 +151,11 @@ class ApplicationLog(Base):
 
 class CaptchaQueueItem(Base):
     __tablename__ = "captcha_queue"
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
     job_listing_id: Mapped[str] = mapped_column(ForeignKey("job_listings.id", ondelete="CASCADE"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     notes: Mapped[str | None] = mapped_column(Text)
 
     job_listing: Mapped[JobListing] = relationship("JobListing")
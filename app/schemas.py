@@ -6,6 +6,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.config import settings
+
 
 class ResumeUpload(BaseModel):
     content: str = Field(..., description="Raw text extracted from the résumé")
@@ -42,6 +44,15 @@ class JobMatch(BaseModel):
     created_at: datetime
 
 
+class BatchSubmissionRequest(BaseModel):
+    job_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.application_batch_max_size,
+        description="Job listings to submit concurrently",
+    )
+
+
 class ApplicationStatus(BaseModel):
     job_id: str
     status: str
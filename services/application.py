@@ -6,18 +6,26 @@ import contextlib
 from datetime import datetime
 from typing import Any
 
-from playwright.async_api import PlaywrightError, async_playwright
-from sqlalchemy.ext.asyncio import AsyncSession
+from playwright.async_api import Browser, Playwright, async_playwright
+from playwright.async_api import Error as PlaywrightError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import Settings
 from app.models import ApplicationLog, CaptchaQueueItem, JobListing
 
+# One selector list lets the captcha check run as a single round-trip to the browser.
+_CAPTCHA_SELECTOR = "iframe[src*='recaptcha'], input[name='captcha'], div.g-recaptcha"
+
 
 class ApplicationSubmitter:
     """Drive Playwright to fill and submit application forms."""
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(settings.application_max_concurrency)
 
     async def submit_job(
         self,
@@ -27,10 +35,12 @@ class ApplicationSubmitter:
     ) -> ApplicationLog:
         log = ApplicationLog(job_listing_id=job_listing.id, status="pending")
         session.add(log)
-        await session.flush()
+        # Commit rather than flush so no write transaction is held open while the browser runs.
+        await session.commit()
 
         try:
-            captcha_detected = await self._attempt_submission(job_listing, answers)
+            async with self._semaphore:
+                captcha_detected = await self._attempt_submission(job_listing, answers)
             if captcha_detected:
                 log.status = "awaiting_captcha"
                 log.captcha_required = True
@@ -51,15 +61,33 @@ class ApplicationSubmitter:
 
         return log
 
+    async def submit_jobs(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        job_listings: list[JobListing],
+        answers: dict[str, Any],
+    ) -> list[ApplicationLog]:
+        """Submit several listings concurrently against the shared browser.
+
+        Concurrency is capped by ``application_max_concurrency``. An ``AsyncSession`` cannot be
+        shared between tasks, so every submission records its log through its own session.
+        """
+
+        async def _submit(job_listing: JobListing) -> ApplicationLog:
+            async with session_factory() as session:
+                return await self.submit_job(session, job_listing, answers)
+
+        return list(await asyncio.gather(*(_submit(job_listing) for job_listing in job_listings)))
+
     async def _attempt_submission(self, job_listing: JobListing, answers: dict[str, Any]) -> bool:
         """Best-effort automated form submission.
 
         Returns True when a captcha is detected and the flow should be paused.
         """
 
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=self.settings.playwright_headless)
-            context = await browser.new_context()
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        try:
             page = await context.new_page()
 
             await page.goto(job_listing.listing_url)
@@ -72,13 +100,36 @@ class ApplicationSubmitter:
 
             if await self._page_has_captcha(page):
                 captcha_detected = True
-
+        finally:
             await context.close()
-            await browser.close()
 
         return captcha_detected
 
+    async def _ensure_browser(self) -> Browser:
+        """Launch Chromium once and share it; each submission gets its own context."""
+
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.settings.playwright_headless)
+            return self._browser
+
+    async def close(self) -> None:
+        """Shut down the shared browser and Playwright driver, if started."""
+
+        async with self._lock:
+            if self._browser is not None:
+                with contextlib.suppress(PlaywrightError):
+                    await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
     async def _fill_form(self, page, answers: dict[str, Any]) -> None:  # type: ignore[override]
+        # Sequential on purpose: fill() focuses the field and then types through the page-wide keyboard,
+        # so concurrent fills on one page can land text in whichever input grabbed focus last.
         for field, value in answers.items():
             selector = f"input[name=\"{field}\"]"
             if isinstance(value, bool):
@@ -91,13 +142,4 @@ class ApplicationSubmitter:
 
     @staticmethod
     async def _page_has_captcha(page) -> bool:  # type: ignore[override]
-        captcha_selectors = [
-            "iframe[src*='recaptcha']",
-            "input[name='captcha']",
-            "div.g-recaptcha",
-        ]
-        for selector in captcha_selectors:
-            element = await page.query_selector(selector)
-            if element is not None:
-                return True
-        return False
+        return await page.evaluate("(selector) => document.querySelector(selector) !== null", _CAPTCHA_SELECTOR)
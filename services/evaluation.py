@@ -1,22 +1,124 @@
 """Job discovery and scoring logic."""
 from __future__ import annotations
 
+import asyncio
 import json
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+from cachetools import TTLCache
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings
+from app.database import upsert_insert
 from app.models import JobListing, QuestionnaireResponse, Resume
 
 
 @dataclass
 class EvaluationContext:
-    skills: set[str]
+    skills: frozenset[str]
     preferences: dict[str, Any]
+    culture: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_records(cls, skills: list[str], preferences: dict[str, Any]) -> EvaluationContext:
+        """Normalise tokens once so scoring only does vocabulary lookups."""
+
+        return cls(
+            skills=frozenset(map(str.lower, skills)),
+            preferences=preferences,
+            culture=frozenset(map(str.lower, preferences.get("culture", []))),
+        )
+
+
+@dataclass
+class JobCorpus:
+    """Sample jobs encoded as dense arrays so the whole corpus scores in one pass."""
+
+    jobs: list[dict[str, Any]]
+    external_ids: list[str | None]  # job "id", with empty values normalised to None
+    skill_vocab: list[str]
+    skill_index: dict[str, int]  # token -> column in skill_matrix
+    skill_matrix: np.ndarray  # bool, jobs x skill_vocab
+    culture_vocab: list[str]
+    culture_index: dict[str, int]
+    culture_matrix: np.ndarray  # bool, jobs x culture_vocab
+    salary: np.ndarray  # float, NaN when the listing has no usable salary figure
+    salary_known: np.ndarray  # bool, False when both salary bounds are missing
+
+    @classmethod
+    def from_jobs(cls, jobs: list[dict[str, Any]]) -> JobCorpus:
+        skill_sets = [{skill.lower() for skill in job.get("skills", [])} for job in jobs]
+        culture_sets = [{tag.lower() for tag in job.get("culture", [])} for job in jobs]
+        skill_vocab = sorted(set().union(*skill_sets))
+        culture_vocab = sorted(set().union(*culture_sets))
+        skill_index = _intern(skill_vocab)
+        culture_index = _intern(culture_vocab)
+
+        salary = np.full(len(jobs), np.nan)
+        salary_known = np.zeros(len(jobs), dtype=bool)
+        for row, job in enumerate(jobs):
+            job_min = job.get("salary_min")
+            job_max = job.get("salary_max")
+            salary_known[row] = job_min is not None or job_max is not None
+            if job_min or job_max:
+                salary[row] = job_min or job_max
+
+        return cls(
+            jobs=jobs,
+            external_ids=[job.get("id") or None for job in jobs],
+            skill_vocab=skill_vocab,
+            skill_index=skill_index,
+            skill_matrix=_presence_matrix(skill_sets, skill_index),
+            culture_vocab=culture_vocab,
+            culture_index=culture_index,
+            culture_matrix=_presence_matrix(culture_sets, culture_index),
+            salary=salary,
+            salary_known=salary_known,
+        )
+
+
+def _intern(vocab: list[str]) -> dict[str, int]:
+    return {token: column for column, token in enumerate(vocab)}
+
+
+def _presence_matrix(rows: list[set[str]], index: dict[str, int]) -> np.ndarray:
+    matrix = np.zeros((len(rows), len(index)), dtype=bool)
+    for row, tokens in enumerate(rows):
+        matrix[row, [index[token] for token in tokens]] = True
+    return matrix
+
+
+def _presence_vector(tokens: frozenset[str], index: dict[str, int]) -> np.ndarray:
+    """Encode tokens as a vocabulary mask; tokens unknown to the corpus cannot overlap and are dropped."""
+
+    vector = np.zeros(len(index), dtype=bool)
+    vector[[index[token] for token in tokens if token in index]] = True
+    return vector
+
+
+def _read_job_samples(path: Path) -> list[dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+@lru_cache(maxsize=4)
+def _load_job_samples(path_str: str, mtime_ns: int) -> list[dict[str, Any]]:
+    """Parse the sample file once per modification time.
+
+    ``mtime_ns`` only keys the cache so that edits to the file are picked up.
+    """
+
+    return _read_job_samples(Path(path_str))
+
+
+@lru_cache(maxsize=4)
+def _load_job_corpus(path_str: str, mtime_ns: int) -> JobCorpus:
+    return JobCorpus.from_jobs(_load_job_samples(path_str, mtime_ns))
 
 
 class JobEvaluator:
@@ -24,6 +126,10 @@ class JobEvaluator:
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self._contexts: TTLCache[tuple[str, str | None, str | None], EvaluationContext] = TTLCache(
+            maxsize=settings.evaluation_context_cache_size,
+            ttl=settings.evaluation_context_cache_ttl_seconds,
+        )
 
     async def evaluate_for_user(
         self,
@@ -33,132 +139,202 @@ class JobEvaluator:
         limit: int | None = None,
     ) -> list[JobListing]:
         context = await self._build_context(session, user_id)
-        job_samples = self._load_job_samples()
-        matches: list[JobListing] = []
-
-        for index, job in enumerate(job_samples):
-            external_id = job.get("id")
-            if external_id:
-                existing_stmt = select(JobListing).where(
-                    JobListing.user_id == user_id, JobListing.external_id == external_id
-                )
-                existing_result = await session.execute(existing_stmt)
-                if existing_result.scalar_one_or_none():
-                    continue
-
-            score, deviation = self._score_job(context, job)
-            if deviation > self.settings.deviation_tolerance or score < self.settings.evaluation_similarity_threshold:
+        # Loading (on a cache miss) and scoring the corpus is CPU-bound; keep it off the event loop.
+        corpus, user_vec, scores, deviations = await asyncio.to_thread(self._score_all_jobs, context)
+
+        existing = await self._existing_external_ids(session, user_id, corpus)
+        eligible = deviations <= self.settings.deviation_tolerance
+        eligible &= scores >= self.settings.evaluation_similarity_threshold
+        # An external id is stored once: skip ids the user already has, and among the copies of an id that pass the
+        # thresholds keep only the best scoring one (the earliest on ties).
+        kept: dict[str, int] = {}
+        for index in np.flatnonzero(eligible).tolist():
+            external_id = corpus.external_ids[index]
+            if external_id is None:
                 continue
-
-            listing = JobListing(
-                user_id=user_id,
-                source=job.get("source", "sample"),
-                external_id=job.get("id"),
-                title=job.get("title", "Unknown Role"),
-                company=job.get("company", "Unknown"),
-                location=job.get("location"),
-                salary_min=job.get("salary_min"),
-                salary_max=job.get("salary_max"),
-                remote_type=job.get("remote_type"),
-                culture_tags=job.get("culture"),
-                overlap_summary=", ".join(sorted(context.skills & set(job.get("skills", [])))),
-                gap_summary=", ".join(sorted(set(job.get("skills", [])) - context.skills)),
-                notes=job.get("notes"),
-                listing_url=job.get("url", ""),
-                score=score,
-                deviation=deviation,
-                status="queued",
+            if external_id in existing:
+                eligible[index] = False
+                continue
+            previous = kept.get(external_id)
+            if previous is None:
+                kept[external_id] = index
+            elif scores[index] > scores[previous]:
+                eligible[previous] = False
+                kept[external_id] = index
+            else:
+                eligible[index] = False
+
+        rows: list[dict[str, Any]] = []
+        for index in self._top_matches(scores, eligible, limit):
+            job = corpus.jobs[index]
+            job_skills = corpus.skill_matrix[index]
+            overlap = [corpus.skill_vocab[column] for column in np.flatnonzero(job_skills & user_vec)]
+            gap = [corpus.skill_vocab[column] for column in np.flatnonzero(job_skills & ~user_vec)]
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "source": job.get("source", "sample"),
+                    "external_id": corpus.external_ids[index],
+                    "title": job.get("title", "Unknown Role"),
+                    "company": job.get("company", "Unknown"),
+                    "location": job.get("location"),
+                    "salary_min": job.get("salary_min"),
+                    "salary_max": job.get("salary_max"),
+                    "remote_type": job.get("remote_type"),
+                    "culture_tags": job.get("culture"),
+                    "overlap_summary": overlap,
+                    "gap_summary": gap,
+                    "notes": job.get("notes"),
+                    "listing_url": job.get("url", ""),
+                    "score": float(scores[index]),
+                    "deviation": float(deviations[index]),
+                    "status": "queued",
+                }
             )
-            session.add(listing)
-            matches.append(listing)
 
-            if limit and len(matches) >= limit:
-                break
+        if not rows:
+            return []
 
+        insert = upsert_insert(session)
+        if insert is None:
+            matches = [JobListing(**row) for row in rows]
+            session.add_all(matches)
+            await session.commit()
+            refresh_stmt = (
+                select(JobListing)
+                .where(JobListing.id.in_([listing.id for listing in matches]))
+                .execution_options(populate_existing=True)
+            )
+            await session.execute(refresh_stmt)
+            return matches
+
+        # A concurrent evaluation for the same user may have stored some of these ids since the existence check;
+        # ON CONFLICT skips those rows, and RETURNING loads the inserted ones (best first) without a refresh query.
+        stmt = (
+            insert(JobListing)
+            .on_conflict_do_nothing(index_elements=[JobListing.user_id, JobListing.external_id])
+            .returning(JobListing, sort_by_parameter_order=True)
+        )
+        matches = list((await session.scalars(stmt, rows)).all())
         await session.commit()
-        for listing in matches:
-            await session.refresh(listing)
         return matches
 
+    @staticmethod
+    async def _existing_external_ids(session: AsyncSession, user_id: str, corpus: JobCorpus) -> set[str]:
+        """External ids from the corpus that are already stored for this user."""
+
+        external_ids = [external_id for external_id in corpus.external_ids if external_id is not None]
+        if not external_ids:
+            return set()
+        stmt = select(JobListing.external_id).where(
+            JobListing.user_id == user_id, JobListing.external_id.in_(external_ids)
+        )
+        result = await session.execute(stmt)
+        return set(result.scalars().all())
+
     async def _build_context(self, session: AsyncSession, user_id: str) -> EvaluationContext:
-        resume_stmt = (
-            select(Resume)
+        latest_resume_id = (
+            select(Resume.id)
             .where(Resume.user_id == user_id)
-            .order_by(Resume.created_at.desc())
+            .order_by(Resume.created_at.desc(), Resume.id.desc())
             .limit(1)
+            .scalar_subquery()
         )
-        questionnaire_stmt = (
-            select(QuestionnaireResponse)
+        latest_questionnaire_id = (
+            select(QuestionnaireResponse.id)
             .where(QuestionnaireResponse.user_id == user_id)
-            .order_by(QuestionnaireResponse.created_at.desc())
+            .order_by(QuestionnaireResponse.created_at.desc(), QuestionnaireResponse.id.desc())
             .limit(1)
+            .scalar_subquery()
         )
 
-        resume_result = await session.execute(resume_stmt)
-        questionnaire_result = await session.execute(questionnaire_stmt)
+        # Probe with the latest record ids only: a new résumé or questionnaire changes the key,
+        # so cached contexts never need explicit invalidation.
+        ids_result = await session.execute(select(latest_resume_id, latest_questionnaire_id))
+        resume_id, questionnaire_id = ids_result.one()
+        cache_key = (user_id, resume_id, questionnaire_id)
+        cached = self._contexts.get(cache_key)
+        if cached is not None:
+            return cached
 
-        resume = resume_result.scalar_one_or_none()
-        questionnaire = questionnaire_result.scalar_one_or_none()
+        resume = await session.get(Resume, resume_id) if resume_id else None
+        questionnaire = await session.get(QuestionnaireResponse, questionnaire_id) if questionnaire_id else None
 
-        skills = set(resume.derived_skills or []) if resume else set()
+        skills = (resume.derived_skills or []) if resume else []
         preferences = questionnaire.preference_vector if questionnaire else {}
 
-        return EvaluationContext(skills=skills, preferences=preferences or {})
+        context = EvaluationContext.from_records(skills, preferences or {})
+        self._contexts[cache_key] = context
+        return context
 
-    def _load_job_samples(self) -> list[dict[str, Any]]:
+    def _load_job_corpus(self) -> JobCorpus:
         path = Path(self.settings.sample_job_file)
         if not path.exists():
-            return []
-        with path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+            return JobCorpus.from_jobs([])
+        if not self.settings.job_sample_cache_enabled:
+            return JobCorpus.from_jobs(_read_job_samples(path))
+        return _load_job_corpus(str(path), path.stat().st_mtime_ns)
+
+    def _score_all_jobs(self, context: EvaluationContext) -> tuple[JobCorpus, np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(corpus, user_vec, scores, deviations)``; safe to run in a worker thread."""
 
-    def _score_job(self, context: EvaluationContext, job: dict[str, Any]) -> tuple[float, float]:
-        job_skills = set(map(str.lower, job.get("skills", [])))
-        overlap = context.skills & job_skills
-        gap = job_skills - context.skills
+        corpus = self._load_job_corpus()
+        user_vec = _presence_vector(context.skills, corpus.skill_index)
+        scores, deviations = self._score_jobs(context, corpus, user_vec)
+        return corpus, user_vec, scores, deviations
 
-        if not job_skills:
-            base_score = 0.0
-        else:
-            base_score = len(overlap) / len(job_skills)
+    def _score_jobs(
+        self, context: EvaluationContext, corpus: JobCorpus, user_vec: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(scores, deviations)`` for every job in the corpus."""
 
-        salary_deviation = self._salary_deviation(context.preferences, job)
-        culture_bonus = self._culture_alignment(context.preferences, job)
+        overlap_counts = corpus.skill_matrix @ user_vec.astype(np.int32)
+        job_sizes = corpus.skill_matrix.sum(axis=1)
+        gap_counts = job_sizes - overlap_counts
+        base_scores = overlap_counts / np.maximum(job_sizes, 1)
 
-        score = base_score + culture_bonus
-        score = min(score, 1.0)
+        salary_deviation = self._salary_deviation(context.preferences, corpus)
+        culture_bonus = self._culture_alignment(context.culture, corpus)
 
-        deviation = salary_deviation + (len(gap) * 0.05)
+        scores = np.minimum(base_scores + culture_bonus, 1.0)
+        deviations = salary_deviation + gap_counts * 0.05
 
-        return round(score, 3), round(deviation, 3)
+        return np.round(scores, 3), np.round(deviations, 3)
 
     @staticmethod
-    def _salary_deviation(preferences: dict[str, Any], job: dict[str, Any]) -> float:
+    def _top_matches(scores: np.ndarray, eligible: np.ndarray, limit: int | None) -> list[int]:
+        """Indices of the highest scoring eligible jobs, best first."""
+
+        candidates = np.flatnonzero(eligible)
+        if limit and limit < len(candidates):
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order].tolist()
+
+    @staticmethod
+    def _salary_deviation(preferences: dict[str, Any], corpus: JobCorpus) -> np.ndarray:
         salary_pref = preferences.get("salary")
         if not salary_pref:
-            return 0.0
-
-        desired_min = salary_pref.get("min")
-        desired_max = salary_pref.get("max")
-        job_min = job.get("salary_min")
-        job_max = job.get("salary_max")
+            return np.zeros(len(corpus.jobs))
 
-        if job_min is None and job_max is None:
-            return 0.5  # penalise unknown salary slightly
+        # penalise unknown salary slightly
+        unknown_penalty = np.where(corpus.salary_known, 0.0, 0.5)
 
-        target = (desired_min or desired_max or job_min or job_max or 0)
-        job_value = (job_min or job_max or target)
-        if target == 0:
-            return 0.0
+        target = salary_pref.get("min") or salary_pref.get("max")
+        if not target:
+            # Without a desired figure each job is compared against itself.
+            return unknown_penalty
 
-        delta = abs(job_value - target)
-        return round(delta / max(target, 1), 3)
+        job_value = np.where(np.isnan(corpus.salary), target, corpus.salary)
+        delta = np.abs(job_value - target)
+        deviation = np.round(delta / max(target, 1), 3)
+        return np.where(corpus.salary_known, deviation, unknown_penalty)
 
     @staticmethod
-    def _culture_alignment(preferences: dict[str, Any], job: dict[str, Any]) -> float:
-        desired = {kw.lower() for kw in preferences.get("culture", [])}
-        job_culture = {kw.lower() for kw in job.get("culture", [])}
-        if not desired or not job_culture:
-            return 0.0
-        overlap = desired & job_culture
-        return round(len(overlap) / len(desired) * 0.2, 3)
+    def _culture_alignment(desired: frozenset[str], corpus: JobCorpus) -> np.ndarray:
+        if not desired:
+            return np.zeros(len(corpus.jobs))
+        desired_vec = _presence_vector(desired, corpus.culture_index)
+        overlap_counts = corpus.culture_matrix @ desired_vec.astype(np.int32)
+        return np.round(overlap_counts / len(desired) * 0.2, 3)
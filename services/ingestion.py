@@ -1,82 +1,186 @@
 """Utilities for ingesting résumés and questionnaire data."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import os
 import re
-import uuid
+import secrets
+from pathlib import Path
 from typing import Any
 
-import aiofiles
+from cachetools import TTLCache
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import Settings
+from app.config import Settings, settings
+from app.database import upsert_insert
 from app.models import QuestionnaireResponse, Resume, User
 
+_KEYWORDS = frozenset(
+    {
+        "python",
+        "javascript",
+        "typescript",
+        "sql",
+        "aws",
+        "gcp",
+        "azure",
+        "docker",
+        "kubernetes",
+        "django",
+        "fastapi",
+        "react",
+        "node",
+        "ml",
+        "nlp",
+    }
+)
+# User ids whose row is known to be committed, so repeat ingests skip the upsert. Only warmed after a commit.
+_KNOWN_USERS: TTLCache[str, bool] = TTLCache(
+    maxsize=settings.known_user_cache_size, ttl=settings.known_user_cache_ttl_seconds
+)
+# Résumés longer than this are encoded and hashed off the event loop; below it the thread hop costs more.
+_OFFLOAD_THRESHOLD_CHARS = 256 * 1024
+# Questionnaire keys for each salary bound, in priority order.
+_SALARY_MIN_KEYS = ("preferred_salary_min", "salary_min")
+_SALARY_MAX_KEYS = ("preferred_salary_max", "salary_max")
+# One alternation over every keyword, anchored so a match is a whole token: tokens are maximal
+# runs of [A-Za-z0-9#+] and everything else separates them. ASCII-only case folding keeps non-ASCII
+# letters (e.g. the Kelvin sign) as separators, exactly as the token class defines them. The leading
+# lookahead on keyword first letters lets the engine reject most positions before the lookbehind runs.
+_KEYWORD_RE = re.compile(
+    "(?=[" + "".join(sorted({keyword[0] for keyword in _KEYWORDS})) + "])"
+    r"(?<![A-Za-z0-9#+])(?:"
+    + "|".join(map(re.escape, sorted(_KEYWORDS, key=len, reverse=True)))
+    + r")(?![A-Za-z0-9#+])",
+    re.ASCII | re.IGNORECASE,
+)
+
+
+def _first_answer(answers: dict[str, Any], keys: tuple[str, ...]) -> Any:
+    """Return the first non-null answer among ``keys``; unlike ``or``, a legitimate 0 is kept."""
+
+    for key in keys:
+        value = answers.get(key)
+        if value is not None:
+            return value
+    return None
+
 
 class ResumeProcessor:
     """Persist résumés and derive lightweight skill metadata."""
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self._resume_dir = settings.resume_storage_directory
+        self._resume_dir.mkdir(parents=True, exist_ok=True)
 
-    async def store_resume(self, session: AsyncSession, *, user_id: str, content: str) -> Resume:
-        user = await self._ensure_user(session, user_id)
-        storage_path = self._build_storage_path(user_id)
-
-        async with aiofiles.open(storage_path, "w", encoding="utf-8") as handle:
-            await handle.write(content)
+    async def store_resume(
+        self,
+        session: AsyncSession,
+        *,
+        user_id: str,
+        content: str,
+        commit: bool = True,
+    ) -> Resume:
+        await self._ensure_user(session, user_id)
+        if len(content) > _OFFLOAD_THRESHOLD_CHARS:
+            encoded, digest = await asyncio.to_thread(self._encode_and_hash, content)
+        else:
+            encoded, digest = self._encode_and_hash(content)
 
-        derived_skills = self._extract_skills(content)
+        # A re-upload of identical text reuses the stored file and skills; the new row keeps "latest résumé" correct.
+        duplicate = await session.execute(
+            select(Resume.storage_path, Resume.derived_skills)
+            .where(Resume.user_id == user_id, Resume.content_sha256 == digest)
+            .limit(1)
+        )
+        row = duplicate.first()
+        if row is not None:
+            storage_path, derived_skills = row
+        else:
+            path, storage_path = self._build_storage_path(user_id)
+            derived_skills, _ = await asyncio.gather(
+                asyncio.to_thread(self._extract_skills, content, self.settings.resume_scan_window_chars),
+                asyncio.to_thread(self._atomic_write, path, encoded),
+            )
 
         resume = Resume(
-            user_id=user.id,
-            storage_path=str(storage_path),
-            extracted_text=content,
+            user_id=user_id,
+            storage_path=storage_path,
+            content_sha256=digest,
+            extracted_text=None,
             derived_skills=derived_skills,
         )
         session.add(resume)
-        await session.commit()
-        await session.refresh(resume)
+        if commit:
+            await session.commit()
+            _KNOWN_USERS[user_id] = True
         return resume
 
-    def _build_storage_path(self, user_id: str) -> Path:
-        resume_dir = self.settings.resume_storage_directory
-        resume_dir.mkdir(parents=True, exist_ok=True)
-        return resume_dir / f"{user_id}_{uuid.uuid4()}.txt"
+    def resolve_storage_path(self, storage_path: str) -> Path:
+        """Return the on-disk location of a stored résumé.
+
+        New rows store a bare filename inside the résumé directory. Older rows stored the full path as written
+        (relative to the working directory by default), so any value with a directory part is returned unchanged.
+        """
+
+        path = Path(storage_path)
+        if path.parent != Path("."):
+            return path
+        return self._resume_dir / path
+
+    def _build_storage_path(self, user_id: str) -> tuple[Path, str]:
+        """Return the file to write and its name relative to the résumé directory, as stored on the row."""
+
+        name = f"{user_id}_{secrets.token_hex(8)}.txt"
+        return self._resume_dir / name, name
+
+    @staticmethod
+    def _encode_and_hash(content: str) -> tuple[bytes, str]:
+        encoded = content.encode("utf-8")
+        return encoded, hashlib.sha256(encoded).hexdigest()
 
     @staticmethod
-    def _extract_skills(resume_text: str) -> list[str]:
-        tokens = {token.strip().lower() for token in re.split(r"[^A-Za-z0-9#+]+", resume_text) if token}
-        keywords = {
-            "python",
-            "javascript",
-            "typescript",
-            "sql",
-            "aws",
-            "gcp",
-            "azure",
-            "docker",
-            "kubernetes",
-            "django",
-            "fastapi",
-            "react",
-            "node",
-            "ml",
-            "nlp",
-        }
-        return sorted(keyword for keyword in keywords if keyword in tokens)
-
-    async def _ensure_user(self, session: AsyncSession, user_id: str) -> User:
-        result = await session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if user:
-            return user
-
-        placeholder = User(id=user_id)
-        session.add(placeholder)
-        await session.commit()
-        await session.refresh(placeholder)
-        return placeholder
+    def _atomic_write(path: Path, content: bytes) -> None:
+        """Write ``content`` to a sibling temp file and rename it into place."""
+
+        data = memoryview(content)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _extract_skills(resume_text: str, window: int | None = None) -> list[str]:
+        """Return known skills; text longer than ``2 * window`` is scanned only at its head and tail."""
+
+        if window is not None and len(resume_text) > 2 * window:
+            resume_text = f"{resume_text[:window]}\n{resume_text[-window:]}"
+        seen: set[str] = set()
+        for match in _KEYWORD_RE.finditer(resume_text):
+            seen.add(match.group().lower())
+            if len(seen) == len(_KEYWORDS):
+                break
+        return sorted(seen)
+
+    @staticmethod
+    async def _ensure_user(session: AsyncSession, user_id: str) -> None:
+        """Create the user row if it is missing, inside the caller's transaction."""
+
+        if user_id in _KNOWN_USERS:
+            return
+        insert = upsert_insert(session)
+        if insert is None:
+            if await session.get(User, user_id) is None:
+                session.add(User(id=user_id))
+            return
+        await session.execute(insert(User).values(id=user_id).on_conflict_do_nothing(index_elements=[User.id]))
 
 
 class QuestionnaireProcessor:
@@ -91,25 +195,27 @@ class QuestionnaireProcessor:
         *,
         user_id: str,
         answers: dict[str, Any],
+        commit: bool = True,
     ) -> QuestionnaireResponse:
-        user = await ResumeProcessor(self.settings)._ensure_user(session, user_id)
+        await ResumeProcessor._ensure_user(session, user_id)
         preference_vector = self._build_preference_vector(answers)
 
         record = QuestionnaireResponse(
-            user_id=user.id,
+            user_id=user_id,
             raw_answers=answers,
             preference_vector=preference_vector,
         )
         session.add(record)
-        await session.commit()
-        await session.refresh(record)
+        if commit:
+            await session.commit()
+            _KNOWN_USERS[user_id] = True
         return record
 
     @staticmethod
     def _build_preference_vector(answers: dict[str, Any]) -> dict[str, Any]:
         vector: dict[str, Any] = {}
-        salary_min = answers.get("preferred_salary_min") or answers.get("salary_min")
-        salary_max = answers.get("preferred_salary_max") or answers.get("salary_max")
+        salary_min = _first_answer(answers, _SALARY_MIN_KEYS)
+        salary_max = _first_answer(answers, _SALARY_MAX_KEYS)
         if salary_min is not None or salary_max is not None:
             vector["salary"] = {
                 "min": int(salary_min) if salary_min is not None else None,
@@ -118,11 +224,11 @@ class QuestionnaireProcessor:
 
         locations = answers.get("preferred_locations")
         if isinstance(locations, (list, tuple)):
-            vector["locations"] = [str(loc).lower() for loc in locations]
+            vector["locations"] = list(map(str.lower, map(str, locations)))
 
         culture_keywords = answers.get("culture_keywords")
         if isinstance(culture_keywords, (list, tuple)):
-            vector["culture"] = [str(keyword).lower() for keyword in culture_keywords]
+            vector["culture"] = list(map(str.lower, map(str, culture_keywords)))
 
         remote = answers.get("remote_ok")
         if isinstance(remote, bool):
@@ -144,5 +250,7 @@ async def bootstrap_demo_user(
     resume_processor = ResumeProcessor(settings)
     questionnaire_processor = QuestionnaireProcessor(settings)
 
-    await resume_processor.store_resume(session, user_id=user_id, content=resume_text)
-    await questionnaire_processor.store_responses(session, user_id=user_id, answers=questionnaire_answers)
+    await resume_processor.store_resume(session, user_id=user_id, content=resume_text, commit=False)
+    await questionnaire_processor.store_responses(session, user_id=user_id, answers=questionnaire_answers, commit=False)
+    await session.commit()
+    _KNOWN_USERS[user_id] = True
@@ -0,0 +1,17 @@
+"""Shared pytest setup."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+# Settings are read (and their directories created) at import time, so point them at a scratch location first.
+_SCRATCH = Path(tempfile.mkdtemp(prefix="autogpt-tests-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_SCRATCH / 'app.db'}")
+os.environ.setdefault("DATA_DIRECTORY", str(_SCRATCH))
+os.environ.setdefault("RESUME_STORAGE_DIRECTORY", str(_SCRATCH / "resumes"))
+os.environ.setdefault("QUESTIONNAIRE_STORAGE_DIRECTORY", str(_SCRATCH / "questionnaires"))
+
+# ``services`` imports ``app.config``, which pulls in ``app.main`` and back into ``services``; load ``app`` first.
+import app  # noqa: F401
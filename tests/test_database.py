@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import pytest
+
+from app.database import _json_dumps, _json_loads
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"answer": 2**63 - 1},
+        {"answer": -(2**63)},
+        {"answer": 2**64 - 1},
+        {"answer": -(2**63) - 1},
+        {"answer": 10**30},
+        {"answer": [-(10**18), 10**18, 1.5, "12345678901234567890"]},
+        {1: "non-string key"},
+    ],
+)
+def test_json_round_trip_keeps_exact_integers(value: dict) -> None:
+    expected = {str(key): item for key, item in value.items()}
+    assert _json_loads(_json_dumps(value)) == expected
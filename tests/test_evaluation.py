@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from services.evaluation import (
+    EvaluationContext,
+    JobCorpus,
+    JobEvaluator,
+    _presence_vector,
+)
+
+
+def _reference_score(skills: set[str], preferences: dict[str, Any], job: dict[str, Any]) -> tuple[float, float]:
+    """The original per-job scorer, kept verbatim as the reference for the vectorised one."""
+
+    job_skills = set(map(str.lower, job.get("skills", [])))
+    overlap = skills & job_skills
+    gap = job_skills - skills
+    base_score = len(overlap) / len(job_skills) if job_skills else 0.0
+
+    salary_deviation = 0.0
+    salary_pref = preferences.get("salary")
+    if salary_pref:
+        job_min = job.get("salary_min")
+        job_max = job.get("salary_max")
+        if job_min is None and job_max is None:
+            salary_deviation = 0.5
+        else:
+            target = salary_pref.get("min") or salary_pref.get("max") or job_min or job_max or 0
+            job_value = job_min or job_max or target
+            if target != 0:
+                salary_deviation = round(abs(job_value - target) / max(target, 1), 3)
+
+    culture_bonus = 0.0
+    desired = {keyword.lower() for keyword in preferences.get("culture", [])}
+    job_culture = {keyword.lower() for keyword in job.get("culture", [])}
+    if desired and job_culture:
+        culture_bonus = round(len(desired & job_culture) / len(desired) * 0.2, 3)
+
+    score = min(base_score + culture_bonus, 1.0)
+    deviation = salary_deviation + len(gap) * 0.05
+    return round(score, 3), round(deviation, 3)
+
+
+def _random_case(rng: random.Random) -> tuple[list[dict[str, Any]], list[str], dict[str, Any]]:
+    jobs = []
+    for index in range(rng.randint(0, 12)):
+        job: dict[str, Any] = {"id": f"job-{index}"}
+        if rng.random() < 0.9:
+            job["skills"] = rng.sample(["python", "AWS", "aws", "sql", "docker", "go", "k8s"], rng.randint(0, 4))
+        if rng.random() < 0.8:
+            job["culture"] = rng.sample(["remote", "Remote", "inclusive", "fast"], rng.randint(0, 3))
+        for key in ("salary_min", "salary_max"):
+            if rng.random() < 0.7:
+                job[key] = rng.choice([0, 50_000, 100_000, 150_000.0, 200_000, None])
+        jobs.append(job)
+    skills = rng.sample(["python", "aws", "sql", "docker", "react"], rng.randint(0, 4))
+    preferences: dict[str, Any] = {}
+    if rng.random() < 0.7:
+        preferences["salary"] = {
+            "min": rng.choice([None, 0, 90_000, 120_000]),
+            "max": rng.choice([None, 0, 160_000]),
+        }
+    if rng.random() < 0.7:
+        preferences["culture"] = rng.sample(["remote", "Inclusive", "chill"], rng.randint(0, 3))
+    return jobs, skills, preferences
+
+
+def test_vectorised_scores_match_per_job_scorer() -> None:
+    rng = random.Random(1)
+    evaluator = JobEvaluator(settings)
+    for _ in range(2_000):
+        jobs, skills, preferences = _random_case(rng)
+        context = EvaluationContext.from_records(skills, preferences)
+        corpus = JobCorpus.from_jobs(jobs)
+        scores, deviations = evaluator._score_jobs(
+            context, corpus, _presence_vector(context.skills, corpus.skill_index)
+        )
+        expected = [_reference_score(set(skills), preferences, job) for job in jobs]
+        assert scores.tolist() == [score for score, _ in expected], (jobs, skills, preferences)
+        assert deviations.tolist() == [deviation for _, deviation in expected], (jobs, skills, preferences)
+
+
+@pytest.mark.parametrize("limit", [None, 0, 1, 2, 5, 50])
+def test_top_matches_orders_best_first(limit: int | None) -> None:
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        scores = np.round(rng.random(rng.integers(0, 30)), 1)
+        eligible = scores >= 0.3
+        expected = sorted(np.flatnonzero(eligible).tolist(), key=lambda index: -scores[index])
+        if limit:
+            expected = expected[:limit]
+        top = JobEvaluator._top_matches(scores, eligible, limit)
+        assert scores[top].tolist() == scores[expected].tolist()
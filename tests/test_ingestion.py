@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from services.ingestion import _KEYWORDS, ResumeProcessor
+
+
+def _split_extract(resume_text: str) -> list[str]:
+    """The original tokenizer: split on anything outside ``[A-Za-z0-9#+]`` and keep known keywords."""
+
+    tokens = {token.strip().lower() for token in re.split(r"[^A-Za-z0-9#+]+", resume_text) if token}
+    return sorted(keyword for keyword in _KEYWORDS if keyword in tokens)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "Python, SQL and AWS; some Docker.",
+        "python3 pythonic #python python+ c++python",
+        "\u212aubernetes and kubernetes",  # Kelvin sign lower-cases to an ASCII "k"
+        "PYTHON\u0130 dev",  # dotted capital I lower-cases to "i" plus a combining mark
+        "\u0130python stra\u00dfe-sql \u00e9docker",
+        "react/typescript\nnode.js",
+    ],
+)
+def test_extract_skills_matches_split_tokenizer(text: str) -> None:
+    assert ResumeProcessor._extract_skills(text) == _split_extract(text)
+
+
+def test_extract_skills_matches_split_tokenizer_on_random_text() -> None:
+    rng = random.Random(0)
+    alphabet = list("abcdefghijklmnopqrstuvwxyzPYTHON#+ .-_/\n0123Kİßé")
+    words = [*_KEYWORDS, "node.js", "c#", "python3", "mlops", "nlp+", "#sql", "AWS"]
+    for _ in range(5_000):
+        parts = [
+            rng.choice(words) if rng.random() < 0.5 else "".join(rng.choices(alphabet, k=rng.randint(0, 4)))
+            for _ in range(rng.randint(0, 12))
+        ]
+        text = "".join(rng.choice(["", " ", "-", "x", "é", "+"]) + part for part in parts)
+        if rng.random() < 0.5:
+            text = text.upper()
+        assert ResumeProcessor._extract_skills(text) == _split_extract(text), text
+
+
+def test_extract_skills_window_scans_head_and_tail_only() -> None:
+    filler = "x " * 50_000
+    text = f"python {filler}sql {filler} docker"
+    assert ResumeProcessor._extract_skills(text, 1_000) == ["docker", "python"]
+    short = "python sql docker"
+    assert ResumeProcessor._extract_skills(short, 1_000) == _split_extract(short)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import time
+import uuid
+
+import pytest
+
+from app import models
+from app.models import _new_id
+
+
+def test_new_id_is_uuid7_with_current_timestamp() -> None:
+    before_ms = time.time_ns() // 1_000_000
+    value = uuid.UUID(_new_id())
+    after_ms = time.time_ns() // 1_000_000
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before_ms <= value.int >> 80 <= after_ms + 1
+
+
+def test_new_ids_are_strictly_increasing() -> None:
+    ids = [_new_id() for _ in range(20_000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_new_ids_stay_ordered_when_the_clock_stalls_or_steps_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Restore the generator state afterwards so later ids are not stamped with the frozen clock.
+    monkeypatch.setattr(models, "_id_last_ms", models._id_last_ms)
+    monkeypatch.setattr(models, "_id_sequence", models._id_sequence)
+    frozen_ns = (time.time_ns() // 1_000_000 + 60_000) * 1_000_000  # ahead of any id issued so far
+    monkeypatch.setattr(models.time, "time_ns", lambda: frozen_ns)
+    # More ids than the 12-bit sequence holds, all within one millisecond.
+    ids = [_new_id() for _ in range(0x1000 + 10)]
+    monkeypatch.setattr(models.time, "time_ns", lambda: frozen_ns - 5_000_000)
+    ids += [_new_id() for _ in range(10)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)